@@ -0,0 +1,121 @@
+import json
+import pandas as pd
+from pathlib import Path
+
+class LMWCache:
+
+    def __init__(self, cache_dir, ttl = 60):
+        """
+        Initialize the LMWCache object.
+
+        Raw responses of the Rijkswaterstaat API are stored on disk in slices of one day per
+        (location, grootheid), e.g. cache_dir/LOBI_Q/2025-09-09.json.
+        A slice that was fetched after the end of its day is complete and never expires.
+        Other slices (today, future days of a forecast, failed requests) expire after ttl minutes.
+
+        :param cache_dir: Directory for the cached responses
+        :param ttl: Time to live in minutes for slices that are not complete
+        """
+        self.cache_dir = Path(cache_dir)
+        self.ttl = pd.Timedelta(float(ttl), 'min')
+
+    def slice_file(self, loc_code, grootheid_code, day):
+        """
+        Path of the file with the cached response for one day.
+        """
+        return self.cache_dir / f'{loc_code}_{grootheid_code}' / f'{day.strftime("%Y-%m-%d")}.json'
+
+    def read_slice(self, loc_code, grootheid_code, day):
+        """
+        Read the cached response for one day.
+
+        :return: dict with the keys 'fetched', 'complete', 'Locatie', 'AquoMetadata' and 'MetingenLijst',
+                 or None if the day is not in the cache
+        """
+        f = self.slice_file(loc_code, grootheid_code, day)
+        if not f.is_file():
+            return None
+        with open(f, 'r') as fp:
+            return json.load(fp)
+
+    def is_fresh(self, loc_code, grootheid_code, day, now = None):
+        """
+        Check if a day is in the cache and can be used without fetching it again.
+        """
+        cached = self.read_slice(loc_code, grootheid_code, day)
+        if cached is None:
+            return False
+        if cached['complete']:
+            return True
+        now = pd.Timestamp.now() if now is None else now
+        return now - pd.Timestamp(cached['fetched']) < self.ttl
+
+    def missing_ranges(self, loc_code, grootheid_code, days, now = None):
+        """
+        Group the days that have to be fetched into ranges of consecutive days.
+
+        :param days: DatetimeIndex with the requested days
+        :return: list of (first day, last day) tuples
+        """
+        ranges = []
+        for day in days:
+            if self.is_fresh(loc_code, grootheid_code, day, now):
+                continue
+            if ranges and ranges[-1][1] == day - pd.Timedelta(1, 'd'):
+                ranges[-1] = (ranges[-1][0], day)
+            else:
+                ranges.append((day, day))
+        return ranges
+
+    def store(self, loc_code, grootheid_code, days, result, now = None):
+        """
+        Split a raw API response into slices of one day and store them in the cache.
+        Days without measurements are stored as empty slices, so they are not requested again.
+
+        :param days: DatetimeIndex with the days that were requested
+        :param result: JSON object returned by the API
+        """
+        now = pd.Timestamp.now() if now is None else now
+        succesvol = result.get('Succesvol', False)
+
+        locatie, aquo_metadata, per_day = None, None, {}
+        if succesvol:
+            for waarnemingen in result['WaarnemingenLijst']:
+                locatie = waarnemingen['Locatie']
+                aquo_metadata = waarnemingen['AquoMetadata']
+                for d in waarnemingen['MetingenLijst']:
+                    per_day.setdefault(d['Tijdstip'][:10], []).append(d)
+
+        for day in days:
+            f = self.slice_file(loc_code, grootheid_code, day)
+            f.parent.mkdir(parents=True, exist_ok=True)
+            cached = {'fetched': now.isoformat(),
+                      # alleen een geslaagde request na het einde van de dag levert een volledige dag op
+                      'complete': bool(succesvol) and now >= day + pd.Timedelta(1, 'd'),
+                      'Locatie': locatie,
+                      'AquoMetadata': aquo_metadata,
+                      'MetingenLijst': per_day.get(day.strftime('%Y-%m-%d'), [])}
+            with open(f, 'w') as fp:
+                json.dump(cached, fp)
+
+    def assemble(self, loc_code, grootheid_code, days):
+        """
+        Combine the cached slices for the given days into a single response in the format of the API.
+
+        :return: JSON object as returned by the API, with 'Succesvol' False if there are no measurements
+        """
+        locatie, aquo_metadata, metingen = None, None, []
+        for day in days:
+            cached = self.read_slice(loc_code, grootheid_code, day)
+            if cached is None or len(cached['MetingenLijst']) == 0:
+                continue
+            locatie = cached['Locatie']
+            aquo_metadata = cached['AquoMetadata']
+            metingen.extend(cached['MetingenLijst'])
+
+        if len(metingen) == 0:
+            return {'Succesvol': False, 'Foutmelding': 'Geen gegevens gevonden in de cache'}
+        return {'Succesvol': True,
+                'WaarnemingenLijst': [{'Locatie': locatie,
+                                       'AquoMetadata': aquo_metadata,
+                                       'MetingenLijst': metingen}]}
@@ -0,0 +1,148 @@
+import io
+import pandas as pd
+from flask import Response, abort, request, stream_with_context
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+resolutions = {'day': 'D', 'week': 'W', 'month': 'MS', 'year': 'YS'}
+mimetypes = {'csv': 'text/csv',
+             'jsonl': 'application/x-ndjson',
+             'arrow': 'application/vnd.apache.arrow.stream'}
+chunk_size = 5000
+# maximale breedte van het smoothing window, gelijk aan de invoer in het dashboard
+max_window = 10
+
+def stream_frame(df, fmt):
+    """
+    Generator that yields a DataFrame in chunks in the requested format.
+
+    :param df: DataFrame to export, the index is exported as the first column
+    :param fmt: 'csv', 'jsonl' or 'arrow'
+    """
+    df = df.reset_index()
+    if fmt == 'csv':
+        yield df.head(0).to_csv(index=False)
+        for i in range(0, len(df), chunk_size):
+            yield df.iloc[i:i + chunk_size].to_csv(index=False, header=False)
+    elif fmt == 'jsonl':
+        for i in range(0, len(df), chunk_size):
+            # elke regel, ook de laatste van een blok, eindigt met precies een newline
+            yield df.iloc[i:i + chunk_size].to_json(orient='records', lines=True, date_format='iso').rstrip('\n') + '\n'
+    elif fmt == 'arrow':
+        schema = pa.Schema.from_pandas(df, preserve_index=False)
+        sink = io.BytesIO()
+        with pa.ipc.new_stream(sink, schema) as writer:
+            for i in range(0, len(df), chunk_size):
+                writer.write_batch(pa.RecordBatch.from_pandas(df.iloc[i:i + chunk_size], schema=schema,
+                                                              preserve_index=False))
+                yield sink.getvalue()
+                sink.seek(0)
+                sink.truncate()
+        yield sink.getvalue()
+
+def export_response(df):
+    """
+    Build a streaming response for a DataFrame, with an ETag based on its contents.
+    If the client already has this version (If-None-Match), a 304 response is returned.
+    """
+    fmt = request.args.get('format', 'csv')
+    if fmt not in mimetypes:
+        abort(400, f"Invalid format. Use {', '.join(mimetypes)}.")
+    if fmt == 'arrow' and pa is None:
+        abort(501, 'Arrow export requires pyarrow')
+
+    etag = f'{fmt}-{len(df)}-{pd.util.hash_pandas_object(df).sum():x}'
+    if etag in request.if_none_match:
+        return Response(status=304, headers={'ETag': f'"{etag}"'})
+
+    return Response(stream_with_context(stream_frame(df, fmt)), mimetype=mimetypes[fmt],
+                    headers={'ETag': f'"{etag}"'})
+
+def int_arg(name, default):
+    """
+    Read an integer query parameter, with a 400 response for invalid values.
+    """
+    value = request.args.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        abort(400, f'Invalid {name}: {value}')
+
+def date_arg(name):
+    """
+    Read a date query parameter, with a 400 response for invalid values.
+    Dates with a timezone are converted to the local time of the data (+01:00).
+    """
+    value = request.args.get(name)
+    if value is None:
+        return None
+    try:
+        ts = pd.Timestamp(value)
+    except ValueError:
+        abort(400, f'Invalid {name}: {value}')
+    if ts is pd.NaT:
+        abort(400, f'Invalid {name}: {value}')
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert('Etc/GMT-1').tz_localize(None)
+    return ts
+
+def register_routes(server, stations):
+    """
+    Add the export routes to the Flask server behind the dash app:
+        /api/<station>/series?start=&end=&resolution=&format=
+        /api/<station>/stats?start_yr=&end_yr=&quantiles=&window=&format=
+
+    start and end are dates (inclusive), so repeat consumers can request only the rows after
+    the last one they received. format is 'csv' (default), 'jsonl' or 'arrow'.
+
+    :param server: Flask server (app.server)
+    :param stations: dict with {name in url: LMWTimeseries object}
+    """
+
+    def get_station(station):
+        if station not in stations:
+            abort(404, f'Unknown station {station}')
+        return stations[station]
+
+    @server.route('/api/<station>/series')
+    def export_series(station):
+        LMW_series = get_station(station)
+        resolution = request.args.get('resolution', 'day')
+        if resolution not in resolutions:
+            abort(400, f"Invalid resolution. Use {', '.join(resolutions)}.")
+
+        start = date_arg('start')
+        end = date_arg('end')
+        df = LMW_series.get_data()[start:end]
+
+        if resolution != 'day':
+            df = df.resample(resolutions[resolution]).mean()
+        return export_response(df.rename_axis('timestamp').to_frame())
+
+    @server.route('/api/<station>/stats')
+    def export_stats(station):
+        LMW_series = get_station(station)
+        snapshot = LMW_series.get_snapshot()
+        climate = LMW_series.time_range('climate', snapshot=snapshot)
+        start_yr = int_arg('start_yr', climate[0])
+        end_yr = int_arg('end_yr', climate[1])
+        window = int_arg('window', 5)
+        if not 1 <= window <= max_window:
+            abort(400, f'Invalid window: must be between 1 and {max_window}')
+        try:
+            quantiles = [float(q) for q in request.args.get('quantiles', '0.1,0.5,0.9').split(',')]
+        except ValueError:
+            abort(400, 'Invalid quantiles')
+        if not all(0 <= q <= 1 for q in quantiles):
+            abort(400, 'Invalid quantiles: must be between 0 and 1')
+        # calculate_stats benoemt de kwantielen als 'p' + procent; deze namen moeten uniek zijn
+        labels = ['p' + format(int(q * 100), '02d') for q in quantiles]
+        if len(set(labels)) < len(labels):
+            abort(400, 'Invalid quantiles: each quantile must round to a different percentage')
+        return export_response(LMW_series.calculate_stats(start_yr, end_yr, quantiles, window,
+                                                              snapshot=snapshot))
@@ -0,0 +1,172 @@
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+class LMWForecastArchive:
+
+    # een record per voorspelde waarde; de tijden zijn opgeslagen als seconden (issue) en dagen (valid) sinds 1970
+    record_dtype = np.dtype([('issue', '<i8'), ('valid', '<i4'), ('lead', '<i2'), ('value', '<f4')])
+    # een indexregel per uitgifte met de positie van de records in het archief
+    index_dtype = np.dtype([('issue', '<i8'), ('offset', '<i8'), ('count', '<i4'),
+                            ('min_valid', '<i4'), ('max_valid', '<i4')])
+
+    def __init__(self, archive_dir):
+        """
+        Initialize the LMWForecastArchive object.
+
+        Forecast issuances are appended to a binary file with fixed size records (issue time, valid date,
+        lead time in days, value). A separate index file holds one entry per issuance with the position of
+        its records and the range of valid dates, so queries only read the records they need.
+        The index entry is written after the records, so an interrupted append is ignored by readers.
+
+        :param archive_dir: Directory of the archive
+        """
+        self.archive_dir = Path(archive_dir)
+        self.records_file = self.archive_dir / 'records.bin'
+        self.index_file = self.archive_dir / 'index.bin'
+
+    def read_index(self):
+        """
+        Read the index of the archive.
+
+        :return: structured numpy array with one entry per issuance
+        """
+        if not self.index_file.is_file():
+            return np.empty(0, dtype=self.index_dtype)
+        return np.fromfile(self.index_file, dtype=self.index_dtype)
+
+    def read_records(self, start, stop):
+        """
+        Read the records start to stop (exclusive) from the archive.
+
+        :return: structured numpy array with records
+        """
+        if stop <= start:
+            return np.empty(0, dtype=self.record_dtype)
+        return np.fromfile(self.records_file, dtype=self.record_dtype, count=stop - start,
+                           offset=start * self.record_dtype.itemsize)
+
+    def to_frame(self, records):
+        """
+        Convert records to a DataFrame with the columns 'issue', 'valid', 'lead' and 'value'.
+        """
+        return pd.DataFrame({'issue': pd.to_datetime(records['issue'], unit='s'),
+                             'valid': pd.to_datetime(records['valid'].astype('datetime64[D]')),
+                             'lead': records['lead'],
+                             'value': records['value']})
+
+    def append(self, issue_time, forecast):
+        """
+        Append a forecast issuance to the archive.
+        An issuance that is identical to the previous one (e.g. fetched again after a restart) is not stored.
+
+        :param issue_time: Time the forecast was issued (fetched)
+        :param forecast: Series with daily forecast values
+        :return: True if the issuance was stored
+        """
+        forecast = forecast.dropna()
+        if len(forecast) == 0:
+            return False
+
+        issue = np.datetime64(pd.Timestamp(issue_time), 's').astype(np.int64)
+        issue_day = np.datetime64(pd.Timestamp(issue_time), 'D').astype(np.int64)
+        valid = forecast.index.values.astype('datetime64[D]').astype(np.int64)
+
+        records = np.empty(len(forecast), dtype=self.record_dtype)
+        records['issue'] = issue
+        records['valid'] = valid
+        records['lead'] = valid - issue_day
+        records['value'] = forecast.to_numpy(dtype=float)
+
+        index = self.read_index()
+        if len(index) > 0:
+            last = index[-1]
+            previous = self.read_records(last['offset'], last['offset'] + last['count'])
+            if (np.array_equal(previous['valid'], records['valid']) and
+                np.array_equal(previous['value'], records['value'])):
+                return False
+            if issue <= last['issue']:
+                raise ValueError('Issue time must be later than the last issuance in the archive.')
+            offset = last['offset'] + last['count']
+        else:
+            self.archive_dir.mkdir(parents=True, exist_ok=True)
+            offset = 0
+
+        entry = np.array([(issue, offset, len(records), valid.min(), valid.max())], dtype=self.index_dtype)
+        with open(self.records_file, 'ab') as f:
+            # eventuele restanten van een onderbroken schrijfactie overschrijven
+            f.truncate(offset * self.record_dtype.itemsize)
+            records.tofile(f)
+        with open(self.index_file, 'ab') as f:
+            entry.tofile(f)
+        return True
+
+    def last(self, k = 1):
+        """
+        Get the last k forecast issuances.
+
+        :param k: Number of issuances
+        :return: DataFrame with the columns 'issue', 'valid', 'lead' and 'value'
+        """
+        index = self.read_index()[-k:]
+        if len(index) == 0:
+            return self.to_frame(np.empty(0, dtype=self.record_dtype))
+        return self.to_frame(self.read_records(index[0]['offset'], index[-1]['offset'] + index[-1]['count']))
+
+    def valid_for(self, date):
+        """
+        Get all forecasts for a given date.
+
+        :param date: The date the forecasts are valid for
+        :return: DataFrame with the columns 'issue', 'valid', 'lead' and 'value'
+        """
+        day = np.datetime64(pd.Timestamp(date), 'D').astype(np.int64)
+        index = self.read_index()
+        index = index[(index['min_valid'] <= day) & (index['max_valid'] >= day)]
+        if len(index) == 0:
+            return self.to_frame(np.empty(0, dtype=self.record_dtype))
+
+        # de betreffende uitgiftes liggen dicht bij elkaar in het archief en worden in een keer gelezen
+        records = self.read_records(index[0]['offset'], index[-1]['offset'] + index[-1]['count'])
+        return self.to_frame(records[records['valid'] == day])
+
+    def by_lead(self, lead, start = None, end = None):
+        """
+        Get the forecasts with a given lead time, issued between start and end.
+
+        :param lead: Lead time in days
+        :param start: First issue time, if not provided the start of the archive is used
+        :param end: Last issue time, if not provided the end of the archive is used
+        :return: Series with the forecast values, indexed by valid date
+        """
+        index = self.read_index()
+        i0, i1 = 0, len(index)
+        if start is not None:
+            i0 = np.searchsorted(index['issue'], np.datetime64(pd.Timestamp(start), 's').astype(np.int64), 'left')
+        if end is not None:
+            i1 = np.searchsorted(index['issue'], np.datetime64(pd.Timestamp(end), 's').astype(np.int64), 'right')
+        if i1 <= i0:
+            return pd.Series(dtype=float, name=f'lead_{lead}')
+
+        records = self.read_records(index[i0]['offset'], index[i1 - 1]['offset'] + index[i1 - 1]['count'])
+        df = self.to_frame(records[records['lead'] == lead])
+        # bij meerdere uitgiftes per dag de laatste gebruiken
+        df = df.drop_duplicates('valid', keep='last')
+        return pd.Series(df['value'].to_numpy(dtype=float), index=df['valid'], name=f'lead_{lead}')
+
+    def skill(self, observed, lead, start = None, end = None):
+        """
+        Calculate the skill of the forecasts with a given lead time against observed values.
+
+        :param observed: Series with daily observed values
+        :param lead: Lead time in days
+        :param start: First issue time
+        :param end: Last issue time
+        :return: dict with the number of forecasts 'n', 'bias', 'mae' and 'rmse'
+        """
+        forecast = self.by_lead(lead, start, end)
+        error = (forecast - observed.reindex(forecast.index)).dropna()
+        return {'n': len(error),
+                'bias': error.mean(),
+                'mae': error.abs().mean(),
+                'rmse': np.sqrt((error ** 2).mean())}
@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+class LMWQualityControl:
+
+    # een record per waarneming in het bestand met vlaggen: tijdstip (seconden sinds 1970) en bitmasker
+    flag_dtype = np.dtype([('timestamp', '<i8'), ('flags', 'u1')])
+
+    def __init__(self, interval = 10, min_value = None, max_value = 20000, max_rate = None,
+                 flatline = None, max_gap = None):
+        """
+        Initialize the LMWQualityControl object.
+
+        Every check sets its own bit in a uint8 flag per observation. Checks are functions of the
+        values and the timestamps (numpy arrays) of a whole batch and return a boolean array.
+        Observations flagged by a rejecting check are set to nan before aggregation, other checks
+        (e.g. gaps) are only reported. Extra checks can be added with add_check.
+
+        :param interval: Expected interval between observations in minutes
+        :param min_value: Values below min_value are rejected
+        :param max_value: Values above max_value are rejected
+        :param max_rate: Spikes are rejected if the rate of change (per minute) to both neighbours exceeds max_rate
+        :param flatline: Runs of at least flatline identical values are rejected
+        :param max_gap: Observations after a gap of more than max_gap minutes are flagged
+        """
+        self.interval = float(interval)
+        self.checks = []
+
+        self.add_check('missing', lambda v, t: np.isnan(v))
+        if min_value is not None or max_value is not None:
+            lower = -np.inf if min_value is None else float(min_value)
+            upper = np.inf if max_value is None else float(max_value)
+            self.add_check('range', lambda v, t: (v < lower) | (v > upper))
+        if max_rate is not None:
+            self.add_check('rate', lambda v, t: self.check_rate(v, t, float(max_rate)))
+        if flatline is not None:
+            self.add_check('flatline', lambda v, t: self.check_flatline(v, int(flatline)))
+        if max_gap is not None:
+            self.add_check('gap', lambda v, t: self.check_gap(t, float(max_gap)), reject=False)
+
+    def add_check(self, name, check, reject = True):
+        """
+        Add a check to the pipeline.
+
+        :param name: Name of the check, used in the summary
+        :param check: Function check(values, timestamps) that returns a boolean array with the flagged observations
+        :param reject: If True, flagged observations are set to nan
+        """
+        if len(self.checks) == 8:
+            raise ValueError('No more than 8 checks can be added.')
+        self.checks.append({'name': name, 'bit': np.uint8(1 << len(self.checks)), 'check': check, 'reject': reject})
+
+    def check_rate(self, v, t, max_rate):
+        """
+        Flag spikes: observations where the rate of change to the previous and the next observation
+        both exceed max_rate, in opposite directions.
+        """
+        if len(v) == 0:
+            return np.zeros(0, dtype=bool)
+        rate = np.diff(v) / (np.diff(t) / np.timedelta64(1, 'm'))
+        rate_in = np.concatenate([[0.0], rate])
+        rate_out = np.concatenate([rate, [0.0]])
+        with np.errstate(invalid='ignore'):
+            return (np.abs(rate_in) > max_rate) & (np.abs(rate_out) > max_rate) & (rate_in * rate_out < 0)
+
+    def check_flatline(self, v, flatline):
+        """
+        Flag runs of at least flatline consecutive identical values.
+        """
+        if len(v) == 0:
+            return np.zeros(0, dtype=bool)
+        # elke verandering van waarde start een nieuwe reeks; de lengte per reeks volgt uit bincount
+        run_id = np.concatenate([[0], np.cumsum(v[1:] != v[:-1])])
+        run_length = np.bincount(run_id)
+        return run_length[run_id] >= flatline
+
+    def check_gap(self, t, max_gap):
+        """
+        Flag observations that follow a gap of more than max_gap minutes.
+        """
+        if len(t) == 0:
+            return np.zeros(0, dtype=bool)
+        gap = np.diff(t) / np.timedelta64(1, 'm')
+        return np.concatenate([[False], gap > max_gap])
+
+    def run(self, series):
+        """
+        Apply all checks to a series of observations.
+
+        :param series: Series with the observations, indexed by timestamp
+        :return: numpy array with a uint8 flag per observation
+        """
+        v = series.to_numpy(dtype=float)
+        t = series.index.values.astype('datetime64[ns]')
+        flags = np.zeros(len(v), dtype=np.uint8)
+        for c in self.checks:
+            flags[c['check'](v, t)] |= c['bit']
+        return flags
+
+    def rejected(self, flags):
+        """
+        :return: boolean array with the observations flagged by a rejecting check
+        """
+        reject = np.uint8(sum(int(c['bit']) for c in self.checks if c['reject']))
+        return (flags & reject) != 0
+
+    def summary(self, flags):
+        """
+        :return: dict with the number of flagged observations per check
+        """
+        return {c['name']: int(np.count_nonzero(flags & c['bit'])) for c in self.checks}
+
+    def completeness(self, series, flags):
+        """
+        Calculate the daily completeness: the number of accepted observations divided by
+        the number of expected observations per day.
+
+        :param series: Series with the observations, indexed by timestamp
+        :param flags: Flags returned by run
+        :return: Series with the completeness (0 - 1) per day
+        """
+        days = series.index.values.astype('datetime64[D]')
+        if len(days) == 0:
+            return pd.Series(dtype=float)
+        day_nr = (days - days[0]).astype(np.int64)
+        accepted = np.bincount(day_nr, weights=(~self.rejected(flags)).astype(float), minlength=day_nr[-1] + 1)
+        expected = 24 * 60 / self.interval
+        return pd.Series(np.minimum(accepted / expected, 1.0),
+                         index=pd.date_range(days[0], periods=len(accepted), freq='D'), name='completeness')
+
+    def write_flags(self, file, series, flags):
+        """
+        Append the flags of a batch of observations to a binary file.
+        """
+        records = np.empty(len(flags), dtype=self.flag_dtype)
+        records['timestamp'] = series.index.values.astype('datetime64[s]').astype(np.int64)
+        records['flags'] = flags
+        f = Path(file)
+        f.parent.mkdir(parents=True, exist_ok=True)
+        with open(f, 'ab') as fp:
+            records.tofile(fp)
+
+    def read_flags(self, file):
+        """
+        Read the flags from a binary file. For observations that were checked more than once
+        the last flag is used.
+
+        :return: Series with the flags, indexed by timestamp
+        """
+        f = Path(file)
+        if not f.is_file():
+            return pd.Series(dtype=np.uint8, name='flags')
+        records = np.fromfile(f, dtype=self.flag_dtype)
+        flags = pd.Series(records['flags'], index=pd.to_datetime(records['timestamp'], unit='s'), name='flags')
+        return flags[~flags.index.duplicated(keep='last')].sort_index()
@@ -0,0 +1,62 @@
+import json
+import sys
+import pandas as pd
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from LMWCache import LMWCache
+
+class LMWStubHandler(BaseHTTPRequestHandler):
+    """
+    Replays responses recorded in an LMWCache directory as if they came from the Rijkswaterstaat API.
+    Point an LMWTimeseries object to the stub server with 'LMW_url' in its configuration file, e.g.
+        LMW_url = http://localhost:8000/OphalenWaarnemingen
+    """
+    cache = None
+
+    def replay(self, request):
+        """
+        Build the response for a request from the recorded responses.
+
+        :param request: JSON object sent to the API
+        :return: JSON object in the format of the API
+        """
+        loc_code = request['Locatie']['Code']
+        grootheid_code = request['AquoPlusWaarnemingMetadata']['AquoMetadata']['Grootheid']['Code']
+        days = pd.date_range(request['Periode']['Begindatumtijd'][:10],
+                             request['Periode']['Einddatumtijd'][:10], freq='D', inclusive='left')
+        return self.cache.assemble(loc_code, grootheid_code, days)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        request = json.loads(self.rfile.read(length))
+
+        body = json.dumps(self.replay(request)).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def make_server(cache_dir, port = 8000, handler = LMWStubHandler):
+    """
+    Create a stub server for the recorded responses in cache_dir.
+
+    :param cache_dir: Directory of the LMWCache with recorded responses
+    :param port: Port to listen on, 0 for a free port
+    :param handler: Request handler class (LMWStubHandler or a subclass)
+    :return: HTTPServer object
+    """
+    handler.cache = LMWCache(cache_dir)
+    return HTTPServer(('localhost', port), handler)
+
+def serve(cache_dir, port = 8000):
+    """
+    Start a stub server for the recorded responses in cache_dir.
+
+    :param cache_dir: Directory of the LMWCache with recorded responses
+    :param port: Port to listen on
+    """
+    make_server(cache_dir, port).serve_forever()
+
+if __name__ == '__main__':
+    # gebruik: python LMWStubServer.py <cache_dir> [port]
+    serve(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 8000)
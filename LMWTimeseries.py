@@ -1,8 +1,17 @@
+import io
+import os
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
 import pandas as pd
 from numpy import nan
 from pathlib import Path
 from datetime import datetime
 import requests
+from LMWCache import LMWCache
+from LMWForecastArchive import LMWForecastArchive
+from LMWQualityControl import LMWQualityControl
 
 class LMWTimeseries:
     
@@ -12,6 +21,13 @@ class LMWTimeseries:
 
         """
         self.data = None
+        # data en afgeleide gegevens (jaren, jaarmaxima, statistiek) worden samen als een geheel vervangen,
+        # zodat lezers altijd een consistente combinatie zien
+        self.snapshot = None
+        self.file_state = None
+        self.lock = threading.Lock()
+        # maximaal aantal bewaarde resultaten van calculate_stats
+        self.stats_cache_size = 32
         self.date_formatstring = "%Y-%m-%dT%H:%M:%S.000+01:00"
         self.date_formatstring_day = "%Y-%m-%dT00:00:00.000+01:00"
 
@@ -20,31 +36,213 @@ class LMWTimeseries:
         
         self.attributes =  self.read_config(configfile) if configfile is not None else {}
 
-    def get_data(self, skip_leap_days = False):
+        # een alternatieve url (bijv. een lokale stub server) kan in het configuratiebestand worden opgegeven
+        if 'LMW_url' in self.attributes:
+            self.url_data_ophalen = self.attributes['LMW_url']
+
+        self.cache = None
+        if 'cache_dir' in self.attributes:
+            self.cache = LMWCache(self.attributes['cache_dir'], self.attributes.get('cache_ttl', 60))
+
+        # voor verwachtingen kan elke opgehaalde uitgifte in een archief worden bewaard
+        self.archive = None
+        if 'forecast_archive' in self.attributes:
+            self.archive = LMWForecastArchive(self.attributes['forecast_archive'])
+
+        # controle van de ruwe waarnemingen voordat de daggemiddelden worden berekend
+        self.qc = LMWQualityControl(interval = self.attributes.get('qc_interval', 10),
+                                    min_value = self.attributes.get('qc_min'),
+                                    max_value = self.attributes.get('qc_max', 20000),
+                                    max_rate = self.attributes.get('qc_max_rate'),
+                                    flatline = self.attributes.get('qc_flatline'),
+                                    max_gap = self.attributes.get('qc_max_gap'))
+
+    def get_data(self, skip_leap_days = False, snapshot = None):
         """ 
         Returns the timeseries data as a pandas Series. 
         If the data is not already loaded, it is read from the specified files in the config file.
         :param skip_leap_days: If True, skip leap days in the data
+        :param snapshot: Snapshot from get_snapshot, if not provided the current snapshot is used
         :return: DataFrame with the timeseries data
         """
-        if self.data is None:
-            data_files = []
-            if 'static_data_files' in self.attributes:
-                data_files = self.attributes['static_data_files'].copy()
-            if 'current_data_file' in self.attributes:
-                data_files.append(self.attributes['current_data_file'])
-            #print(data_files)
-            self.data = self.read_data_files(data_files)
-
-        df = self.data.copy()
+        df = (snapshot or self.get_snapshot())[0].copy()
         if skip_leap_days:
-            # hulpkolom toevoegen met dagen van het jaar
-            df = df.to_frame()
-            df['day'] = df.index.strftime("%m-%d")
-            # alle schrikkeldagen eruit gooien
-            df = df[~(df['day'] == '02-29')]
-            df = df.drop(columns=['day'])
+            df = self.remove_leap_days(df)
+        return df.squeeze()
+
+    def remove_leap_days(self, df):
+        """
+        Remove the leap days from the timeseries data.
+        """
+        # hulpkolom toevoegen met dagen van het jaar
+        df = df.to_frame()
+        df['day'] = df.index.strftime("%m-%d")
+        # alle schrikkeldagen eruit gooien
+        df = df[~(df['day'] == '02-29')]
+        df = df.drop(columns=['day'])
         return df.squeeze()
+
+    def get_snapshot(self):
+        """
+        Returns the current (data, derived) snapshot, loading the data files if necessary.
+        A reader that calls several methods (e.g. build_graph) should take one snapshot
+        and pass it to each of them, so all results belong to the same data.
+
+        :return: tuple with the timeseries data and a dict with derived structures
+        """
+        if self.snapshot is None:
+            with self.lock:
+                if self.snapshot is None:
+                    self.load()
+        return self.snapshot
+
+    def load(self):
+        """
+        Read all data files and build the derived structures.
+        """
+        data_files = []
+        if 'static_data_files' in self.attributes:
+            data_files = self.attributes['static_data_files'].copy()
+        if 'current_data_file' in self.attributes:
+            data_files.append(self.attributes['current_data_file'])
+
+        # de bestandsstatus wordt voor het inlezen bepaald, zodat later toegevoegde regels niet worden gemist
+        self.file_state = self.read_file_state()
+        data = self.read_data_files(data_files)
+        self.snapshot = (data, self.build_derived(data))
+        self.data = data
+
+    def build_derived(self, data):
+        """
+        Build the structures derived from the timeseries data.
+
+        :return: dict with the years, the maximum per year, the first and last day
+                 and a cache for the results of calculate_stats
+        """
+        year_max = data.groupby(data.index.year).max()
+        return {'years': year_max.index,
+                'year_max': year_max,
+                'first_day': data.index[0],
+                'last_day': data.index[-1],
+                'stats': OrderedDict()}
+
+    def update_derived(self, derived, new):
+        """
+        Update the derived structures for newly appended data.
+        Only the maximum of the years with new data is updated and only the statistics
+        for periods that include these years are removed from the cache.
+
+        :param derived: dict with the derived structures of the existing data
+        :param new: Series with the new data
+        :return: dict with the updated derived structures
+        """
+        year_max = pd.concat([derived['year_max'], new.groupby(new.index.year).max()])
+        year_max = year_max.groupby(level=0).max()
+        first_new_year = new.index[0].year
+        return {'years': year_max.index,
+                'year_max': year_max,
+                'first_day': derived['first_day'],
+                'last_day': new.index[-1],
+                'stats': OrderedDict((k, v) for k, v in list(derived['stats'].items()) if k[1] < first_new_year)}
+
+    def read_file_state(self):
+        """
+        Get the modification time, the size and the last line of the current data file.
+
+        :return: dict with the file state, or None if there is no current data file
+        """
+        if 'current_data_file' not in self.attributes:
+            return None
+        f = Path(self.attributes['current_data_file'])
+        if not f.is_file():
+            return None
+        st = f.stat()
+        with open(f, 'rb') as fp:
+            fp.seek(max(st.st_size - 4096, 0))
+            tail = fp.read(st.st_size)
+        last_line = tail[tail.rstrip(b'\n').rfind(b'\n') + 1:]
+        return {'mtime': st.st_mtime_ns, 'size': st.st_size, 'last_line': last_line}
+
+    def refresh(self):
+        """
+        Check if the current data file has changed and load only the newly appended rows.
+        If the file was changed in another way, all data is read again.
+
+        :return: True if new data was loaded
+        """
+        with self.lock:
+            if self.snapshot is None or self.file_state is None:
+                return False
+            f = Path(self.attributes['current_data_file'])
+            try:
+                st = f.stat()
+            except FileNotFoundError:
+                return False
+            state = self.file_state
+            if st.st_mtime_ns == state['mtime'] and st.st_size == state['size']:
+                return False
+
+            # de regels tot en met de laatst gelezen regel moeten ongewijzigd zijn
+            last_line = state['last_line']
+            with open(f, 'rb') as fp:
+                fp.seek(max(state['size'] - len(last_line), 0))
+                appended = st.st_size >= state['size'] and fp.read(len(last_line)) == last_line
+                tail = fp.read() if appended else b''
+            if not appended:
+                self.load()
+                return True
+
+            # alleen volledige regels verwerken
+            tail = tail[:tail.rfind(b'\n') + 1]
+            if len(tail) > 0:
+                last_line = tail[tail.rstrip(b'\n').rfind(b'\n') + 1:]
+            self.file_state = {'mtime': st.st_mtime_ns, 'size': state['size'] + len(tail), 'last_line': last_line}
+            if len(tail) == 0:
+                return False
+
+            data, derived = self.snapshot
+            dfq = pd.read_csv(io.BytesIO(tail), names=['timestamp', data.name])
+            dfq['timestamp'] = pd.to_datetime(dfq['timestamp'], format = '%Y-%m-%d')
+            new = dfq.set_index('timestamp').resample('D').mean().squeeze(axis=1)
+            new = new[new.index > data.index[-1]]
+            if len(new) == 0:
+                return False
+            # ontbrekende dagen tussen de bestaande en de nieuwe data als nan toevoegen, net als bij het inlezen
+            new = new.reindex(pd.date_range(data.index[-1] + pd.Timedelta(1,'D'), new.index[-1], freq='D',
+                                           name=data.index.name))
+
+            data = pd.concat([data, new], axis=0)
+            self.snapshot = (data, self.update_derived(derived, new))
+            self.data = data
+            return True
+
+    def watch(self, interval = 60):
+        """
+        Start a background thread that checks the current data file every interval seconds
+        and loads the newly appended rows.
+
+        :param interval: Polling interval in seconds
+        """
+        def poll():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.refresh()
+                except Exception as e:
+                    # bijv. een bestand dat net wordt weggeschreven; melden en bij de volgende controle opnieuw proberen
+                    self.write_log(f'{datetime.now()} - Refresh of {self.attributes.get("current_data_file")} failed: {e!r}\n')
+
+        threading.Thread(target=poll, daemon=True).start()
+
+    def write_log(self, message):
+        """
+        Append a message to the update log file, or print it if no log file is configured.
+        """
+        if 'update_log_file' in self.attributes:
+            with open(self.attributes['update_log_file'], 'a') as f:
+                f.write(message)
+        else:
+            print(message, end='')
         
     def read_data_files(self, data_files):
         """
@@ -94,49 +292,56 @@ class LMWTimeseries:
             with open(log_file, 'a') as f:
                 f.write(f'    Replace existing data in {self.attributes["current_data_file"]}\n')
         
-        # start_date = laatste datum in de huidige data 
-        # end_date = start van vandaag (laaste waarden van de dag ervoor)
+        # start_day = de dag na de laatste (volledige) dag in de huidige data
+        # end_day = een week na vandaag (voor verwachtingen)
         if len(df_current) == 0:
-            start_date = (pd.Timestamp.today() - pd.Timedelta(30,'d')).strftime(self.date_formatstring_day)
+            start_day = pd.Timestamp.today().normalize() - pd.Timedelta(30,'d')
         else:
-            start_date = df_current.index[-1].strftime(self.date_formatstring_day)
-        end_date = (pd.Timestamp.today() + pd.Timedelta(7,'d')).strftime(self.date_formatstring_day)
-
-        locatie = {'Code': self.attributes['LMW_loc_code'], 
-                   'X': self.attributes['LMW_loc_X'], 
-                   'Y': self.attributes['LMW_loc_Y']}
-        request = {
-            "AquoPlusWaarnemingMetadata": {
-                "AquoMetadata": {
-                    "Grootheid": {'Code' : self.attributes['LMW_grootheid_code']}
-                }
-            },
-            "Locatie": locatie,
-            "Periode": {
-                "Begindatumtijd": start_date,
-                "Einddatumtijd": end_date
-            }
-        }
+            start_day = df_current.index[-1].normalize() + pd.Timedelta(1,'d')
+        end_day = pd.Timestamp.today().normalize() + pd.Timedelta(7,'d')
 
-        resp = requests.post(self.url_data_ophalen, json=request)
-        meta, data = self.parse_response(resp)
+        status_code, result, ranges = self.fetch(start_day, end_day)
+        meta, data = self.parse_result(status_code, result)
 
         with open(log_file, 'a') as f:
                 f.write(f'    Fetching new data from {self.url_data_ophalen}\n')
+                for first, last in ranges:
+                    f.write(f'    Requested {first.date()} to {last.date()}\n')
+                if self.cache is not None:
+                    f.write(f'    Other days between {start_day.date()} and {end_day.date()} read from {self.cache.cache_dir}\n')
                 f.write(f'    Returned: {meta["message"]}\n')
 
         if meta['has_data']:
             dfm = data['data']['Waarde_Numeriek'].squeeze()
 
-            # controleren op ontbrekende waarden 
-            dfm.loc[dfm > 20000] = nan
+            # controleren op ontbrekende en onjuiste waarden
+            flags = self.qc.run(dfm)
+            completeness = self.qc.completeness(dfm, flags)
+            if 'qc_flags_file' in self.attributes:
+                self.qc.write_flags(self.attributes['qc_flags_file'], dfm, flags)
+            dfm = dfm.where(~self.qc.rejected(flags))
 
             with open(log_file, 'a') as f:
                 f.write(f'    Fetched {len(dfm)} new entries between {dfm.index[0]} and {dfm.index[-1]}\n')
-                f.write(f'    including {sum(dfm.isna())} missing values\n')
+                f.write(f'    including {sum(dfm.isna())} missing or rejected values\n')
+                f.write(f'    Flagged: {self.qc.summary(flags)}\n')
+                # de laatste dag is meestal nog niet compleet
+                for day, c in completeness[:-1][completeness[:-1] < 0.9].items():
+                    f.write(f'    Incomplete day {day.date()}: {c:.0%} of the expected values\n')
 
             dfm = dfm.resample('D').mean()
             dfm = dfm.rename(self.attributes['LMW_grootheid_code'])
+
+            if self.archive is not None:
+                # een fout in het archief (bijv. een teruggezette klok) mag de update niet onderbreken
+                try:
+                    archived = self.archive.append(pd.Timestamp.now(), dfm)
+                    message = 'Forecast added to archive' if archived else 'Forecast already in archive'
+                except ValueError as e:
+                    message = f'Forecast not added to archive ({e})'
+                with open(log_file, 'a') as f:
+                    f.write(f'    {message} {self.archive.archive_dir}\n')
+
             if len(df_current) == 0:
                 df_current = dfm
             else:
@@ -144,24 +349,92 @@ class LMWTimeseries:
 
             # dubbele waarden eruit halen
             df_current = df_current[~df_current.index.duplicated(keep='first')]
-            df_current.to_csv(self.attributes['current_data_file'], index=True, index_label='timestamp', float_format='%.2f')
+            # eerst naar een tijdelijk bestand schrijven, zodat lezers nooit een half geschreven bestand zien
+            tmp_file = self.attributes['current_data_file'] + '.tmp'
+            df_current.to_csv(tmp_file, index=True, index_label='timestamp', float_format='%.2f')
+            os.replace(tmp_file, self.attributes['current_data_file'])
         return meta, data['metadata']
 
+    def request_data(self, start_day, end_day):
+        """
+        Request the observations between two days from the web service.
+
+        :param start_day: First day of the period
+        :param end_day: Day after the last day of the period
+        :return: status code and JSON object returned by the API (None if the request failed)
+        """
+        locatie = {'Code': self.attributes['LMW_loc_code'], 
+                   'X': self.attributes['LMW_loc_X'], 
+                   'Y': self.attributes['LMW_loc_Y']}
+        request = {
+            "AquoPlusWaarnemingMetadata": {
+                "AquoMetadata": {
+                    "Grootheid": {'Code' : self.attributes['LMW_grootheid_code']}
+                }
+            },
+            "Locatie": locatie,
+            "Periode": {
+                "Begindatumtijd": start_day.strftime(self.date_formatstring_day),
+                "Einddatumtijd": end_day.strftime(self.date_formatstring_day)
+            }
+        }
+
+        resp = requests.post(self.url_data_ophalen, json=request)
+        return resp.status_code, resp.json() if resp.status_code == 200 else None
+
+    def fetch(self, start_day, end_day):
+        """
+        Fetch the observations between two days, using the on-disk cache if it is configured.
+        Only the days that are not (or no longer) in the cache are requested from the web service.
+
+        :param start_day: First day of the period
+        :param end_day: Day after the last day of the period
+        :return: status code, JSON object in the format of the API and a list of (first day, last day) 
+                 tuples with the periods that were requested from the web service
+        """
+        if self.cache is None:
+            status_code, result = self.request_data(start_day, end_day)
+            return status_code, result, [(start_day, end_day - pd.Timedelta(1,'d'))]
+
+        loc_code = self.attributes['LMW_loc_code']
+        grootheid_code = self.attributes['LMW_grootheid_code']
+        days = pd.date_range(start_day, end_day, freq='D', inclusive='left')
+
+        ranges = self.cache.missing_ranges(loc_code, grootheid_code, days)
+        status_code, result = 200, None
+        for first, last in ranges:
+            status_code, result = self.request_data(first, last + pd.Timedelta(1,'d'))
+            if status_code != 200:
+                # de verlopen gegevens in de cache niet als geslaagd doorgeven
+                return status_code, None, ranges
+            self.cache.store(loc_code, grootheid_code, pd.date_range(first, last, freq='D'), result)
+
+        cached = self.cache.assemble(loc_code, grootheid_code, days)
+        if not cached['Succesvol'] and len(ranges) > 0:
+            # geen data: de foutmelding van de web service doorgeven
+            return status_code, result, ranges
+        return 200, cached, ranges
+
     def parse_response (self,resp):
+        """
+        Extract a dataframe of observations from the response object returned by the API
+        """
+        return self.parse_result(resp.status_code, resp.json() if resp.status_code == 200 else None)
+
+    def parse_result (self, status_code, result):
         """
         Extract a dataframe of observations from the JSON object returned by the API
           {responsereturncode, error, data {locatie, metadata, data} }
         """
         
-        if resp.status_code == 200:
-            result = resp.json()
+        if status_code == 200:
             response = {'has_data' : result['Succesvol']}
             if result['Succesvol']:
                 response.update({'message':'Success (status code: 200)'})
             else:
                 response.update({'message': result['Foutmelding'] + ' (status code: 200)'})
         else:
-            response = {'has_data' : False, 'message': 'Request failed (status code: {})'.format(resp.status_code)}
+            response = {'has_data' : False, 'message': 'Request failed (status code: {})'.format(status_code)}
             data_dict = None
     
         if response['has_data']:
@@ -201,32 +474,42 @@ class LMWTimeseries:
 
         return response, data_dict
 
-    def current_year(self):
+    def current_year(self, snapshot = None):
         """
         Get the current year from the timeseries data.
 
+        :param snapshot: Snapshot from get_snapshot, if not provided the current snapshot is used
         :return: Current year
         """
-        df = self.get_data(skip_leap_days=False)
-        currentyear = df.index[-1].year
+        currentyear = (snapshot or self.get_snapshot())[1]['last_day'].year
         return currentyear
     
-    def range_max(self, ref_yr = None):
+    def range_max(self, ref_yr = None, snapshot = None):
         """
         Calculate the maximum range for the timeseries data.
 
         :param ref_yr: Reference year for the calculation. If not provided, the entire dataset is used.
+        :param snapshot: Snapshot from get_snapshot, if not provided the current snapshot is used
         :return: Maximum range
         """
-        df = self.get_data(skip_leap_days=False)
+        year_max = (snapshot or self.get_snapshot())[1]['year_max']
 
         if not ref_yr is None:
-            # als er een referentiejaar is opgegeven, dan wordt de data van dat jaar gebruikt
-            df = df[df.index.year == ref_yr]
+            # als er een referentiejaar is opgegeven, dan wordt het maximum van dat jaar gebruikt
+            return (int(year_max[ref_yr]/1000)+1)*1000
         
-        return (int(df.max()/1000)+1)*1000
+        return (int(year_max.max()/1000)+1)*1000
     
-    def time_range(self, mode = 'years'):
+    def years(self, snapshot = None):
+        """
+        Get the years in the timeseries data.
+
+        :param snapshot: Snapshot from get_snapshot, if not provided the current snapshot is used
+        :return: Index with the years
+        """
+        return (snapshot or self.get_snapshot())[1]['years']
+
+    def time_range(self, mode = 'years', snapshot = None):
         """
         Get the time range of the timeseries data.
 
@@ -235,59 +518,70 @@ class LMWTimeseries:
             'years'   : return start year and end year
             'climate' : return the most recent period of 30 years
             'marks'   : return a dict with 5 or 10-year {label:year} intervals, depending on the length of the timeseries
+        :param snapshot: Snapshot from get_snapshot, if not provided the current snapshot is used
         :return: a tuple or a dict, depending on the mode
         """
-        df = self.get_data(skip_leap_days=False)
-        num_years = df.index[-1].year - df.index[0].year + 1
+        derived = (snapshot or self.get_snapshot())[1]
+        first_day, last_day = derived['first_day'], derived['last_day']
+        num_years = last_day.year - first_day.year + 1
         if num_years < 60:
             yr_interval = 5
         else:
             yr_interval = 10
 
         if mode == 'years':
-            return (df.index[0].year, df.index[-1].year)
+            return (first_day.year, last_day.year)
         elif mode == 'days':
-            return (df.index[0], df.index[-1])
+            return (first_day, last_day)
         elif mode == 'climate':
-            offset = (df.index[-1].year - 1 )% yr_interval
-            end = df.index[-1].year - 1 - offset
+            offset = (last_day.year - 1 )% yr_interval
+            end = last_day.year - 1 - offset
             return (end - 29, end)
         elif mode == 'marks':
             # de eerste markering is het eerste jaar van de tijdreeks
-            marks = {df.index[0].year: str(df.index[0].year)}
+            marks = {first_day.year: str(first_day.year)}
 
             # de start van reeks markeringen is het startjaar van het eerste volledige decennium
-            offset = df.index[0].year % yr_interval
-            start = df.index[0].year + yr_interval - offset
+            offset = first_day.year % yr_interval
+            start = first_day.year + yr_interval - offset
             
             # de laatste markering is het startjaar van het laatste volledige decennium of het laatste decennium
-            offset = df.index[-1].year % yr_interval
+            offset = last_day.year % yr_interval
             if offset < 4:
-                end = df.index[-1].year - offset - yr_interval
+                end = last_day.year - offset - yr_interval
             else:
-                end = df.index[-1].year - offset 
+                end = last_day.year - offset 
 
             for i in range(start, end + 1, yr_interval):
                 marks[i] = f'{i}'
 
             # de laatste markering is het laatste jaar van de tijdreeks
-            marks[self.current_year()] = f'{self.current_year()}'
+            marks[last_day.year] = f'{last_day.year}'
             return marks
         else:
             raise ValueError("Invalid mode. Use 'years', 'days', 'climate', 'marks'.")
 
     
-    def calculate_stats(self,start_yr, end_yr, quantiles,smoothing_window = 5):
+    def calculate_stats(self,start_yr, end_yr, quantiles,smoothing_window = 5, snapshot = None):
         """
         Calculate statistics for the timeseries data.
 
         :param start_yr: Start year for the statistics
         :param end_yr: End year for the statistics
         :param smoothing_window: Window size for smoothing
+        :param snapshot: Snapshot from get_snapshot, if not provided the current snapshot is used
         :return: DataFrame with calculated statistics
         """
 
-        df = self.get_data(skip_leap_days=True).to_frame()
+        # resultaten worden bewaard bij de data waarmee ze zijn berekend (de laatst gebruikte)
+        data, derived = snapshot or self.get_snapshot()
+        key = (start_yr, end_yr, tuple(quantiles), smoothing_window)
+        with self.lock:
+            if key in derived['stats']:
+                derived['stats'].move_to_end(key)
+                return derived['stats'][key].copy()
+
+        df = self.remove_leap_days(data).to_frame()
         df['day'] = df.index.strftime("%m-%d")
     
         stat_data = df[(df.index.year >=start_yr) & (df.index.year <= end_yr)].groupby('day')
@@ -313,7 +607,74 @@ class LMWTimeseries:
         # de extra rijen aan begin en eind van de tabel worden weer verwijderd
         stats_rolling = stats_rolling[smoothing_window:(smoothing_window+365)]
 
-        return stats_rolling
+        with self.lock:
+            derived['stats'][key] = stats_rolling
+            while len(derived['stats']) > self.stats_cache_size:
+                derived['stats'].popitem(last=False)
+        return stats_rolling.copy()
+
+    def detect_events(self, thresholds, kind = 'low', min_duration = 1, snapshot = None):
+        """
+        Detect all runs of consecutive days below (low flow) or above (high flow) one or more thresholds.
+
+        All thresholds are handled in one pass using run-length encoding over the daily values.
+        Missing days end an event.
+
+        :param thresholds: A single threshold or a list of thresholds
+        :param kind: 'low' for days below the threshold, 'high' for days above the threshold
+        :param min_duration: Minimum duration (in days) of an event
+        :param snapshot: Snapshot from get_snapshot, if not provided the current snapshot is used
+        :return: DataFrame with one row per event and the columns
+            'threshold' : threshold of the event
+            'start'     : first day of the event
+            'end'       : last day of the event
+            'duration'  : number of days
+            'volume'    : deficit (low) or excess (high) volume with respect to the threshold [m3]
+            'peak'      : lowest (low) or highest (high) value during the event
+        """
+        columns = ['threshold', 'start', 'end', 'duration', 'volume', 'peak']
+
+        df = self.get_data(skip_leap_days=False, snapshot=snapshot).asfreq('D')
+        q = df.to_numpy(dtype=float)
+        thr = np.atleast_1d(np.asarray(thresholds, dtype=float))
+
+        # matrix met een rij per drempelwaarde; vergelijkingen met nan zijn altijd False
+        if kind == 'low':
+            mask = q[np.newaxis, :] < thr[:, np.newaxis]
+        elif kind == 'high':
+            mask = q[np.newaxis, :] > thr[:, np.newaxis]
+        else:
+            raise ValueError("Invalid kind. Use 'low' or 'high'.")
+
+        # begin en eind van elke reeks vinden door de rijen aan beide kanten met False aan te vullen
+        padded = np.zeros((len(thr), len(q) + 2), dtype=np.int8)
+        padded[:, 1:-1] = mask
+        edges = np.diff(padded, axis=1)
+        thr_idx, starts = np.nonzero(edges == 1)
+        _, ends = np.nonzero(edges == -1)   # eerste dag na het event
+
+        keep = (ends - starts) >= min_duration
+        thr_idx, starts, ends = thr_idx[keep], starts[keep], ends[keep]
+        if len(starts) == 0:
+            return pd.DataFrame(columns=columns)
+
+        # tekort/overschot per dag cumulatief optellen, zodat het volume per event een verschil is
+        excess = np.where(mask, np.abs(q[np.newaxis, :] - thr[:, np.newaxis]), 0.0)
+        cum_excess = np.zeros((len(thr), len(q) + 1))
+        cum_excess[:, 1:] = np.cumsum(excess, axis=1)
+        volume = (cum_excess[thr_idx, ends] - cum_excess[thr_idx, starts]) * 86400
+
+        # extreme waarde per event; een extra element achteraan zorgt dat 'ends' een geldige index is
+        reduce = np.minimum if kind == 'low' else np.maximum
+        bounds = np.column_stack([starts, ends]).ravel()
+        peak = reduce.reduceat(np.append(q, nan), bounds)[::2]
+
+        return pd.DataFrame({'threshold': thr[thr_idx],
+                             'start': df.index[starts],
+                             'end': df.index[ends - 1],
+                             'duration': ends - starts,
+                             'volume': volume,
+                             'peak': peak}, columns=columns)
 
     def __repr__(self):
         """
@@ -334,6 +695,9 @@ class LMWTimeseries:
 
         if 'static_data_files' in config:
             config['static_data_files'] = config['static_data_files'].split(',')
+        for key in ['event_thresholds_low', 'event_thresholds_high']:
+            if key in config:
+                config[key] = [float(v) for v in config[key].split(',')]
         return config
 
     def write_config(self,file, config):
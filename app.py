@@ -5,6 +5,7 @@ from dash import Dash, dcc, html, Input, Output, ctx
 import dash_bootstrap_components as dbc
 #import lobith_data_update as lobith
 from LMWTimeseries import LMWTimeseries
+from LMWExport import register_routes
 
 bckgr_quantiles = {'numeric':[.02, 0.1, .3, .5, .7, .9, .98],
                    'names':['p02', 'p10', 'p30', 'p50', 'p70', 'p90', 'p98'],
@@ -18,21 +19,28 @@ bckgr_quantiles = {'numeric':[.02, 0.1, .3, .5, .7, .9, .98],
                    }
 extra_yrs_colors = ['black', 'blue', 'green']
 extra_yrs_dash = ['dot', 'dash', 'dashdot']
+event_colours = {'low': 'rgba(255,  0,  0,0.1)',
+                 'high': 'rgba(  0,  0,255,0.1)'}
 
 def build_graph (LMW_series, LMW_prediction = None, ref_yr = None, extra_years = [], qrange = [0,12000], 
-                 stats_period = [1991,2020], window = 5, quantiles = bckgr_quantiles['numeric']):
+                 stats_period = [1991,2020], window = 5, quantiles = bckgr_quantiles['numeric'], n_forecasts = 5,
+                 snapshot = None):
     """
     """
 
+    # alle gegevens voor de grafiek komen uit dezelfde versie van de data
+    if snapshot is None:
+        snapshot = LMW_series.get_snapshot()
+
     if (ref_yr is None):
-        date_year = LMW_series.current_year()
+        date_year = LMW_series.current_year(snapshot=snapshot)
     else:
         date_year = ref_yr
 
     x = pd.date_range(start=f"{date_year}-01-01",end=f"{date_year}-12-31")
 
-    df_stat = LMW_series.calculate_stats(stats_period[0], stats_period[1], quantiles, window)
-    dfq = LMW_series.get_data()
+    df_stat = LMW_series.calculate_stats(stats_period[0], stats_period[1], quantiles, window, snapshot=snapshot)
+    dfq = LMW_series.get_data(snapshot=snapshot)
 
     fig = go.Figure()
 
@@ -78,8 +86,28 @@ def build_graph (LMW_series, LMW_prediction = None, ref_yr = None, extra_years =
 
         fig.add_trace(go.Scatter(x=x, y=Q_refyr, mode = 'lines', name = ref_yr, line= dict(color='black')))
 
-        if ref_yr == LMW_series.current_year():
+        # laag- en hoogwater events in het referentiejaar arceren
+        for kind in ['low', 'high']:
+            if f'event_thresholds_{kind}' in LMW_series.attributes:
+                events = LMW_series.detect_events(LMW_series.attributes[f'event_thresholds_{kind}'], kind,
+                                                     snapshot=snapshot)
+                events = events[(events['end'] >= x[0]) & (events['start'] <= x[-1])]
+                for _, ev in events.iterrows():
+                    fig.add_vrect(x0 = max(ev['start'], x[0]), x1 = min(ev['end'], x[-1]) + pd.Timedelta(1, 'd'),
+                                  fillcolor = event_colours[kind], line_width = 0, layer = 'below')
+
+        if ref_yr == LMW_series.current_year(snapshot=snapshot):
             if not (LMW_prediction is None):
+                # eerdere verwachtingen uit het archief; de laatste uitgifte is de huidige verwachting
+                if LMW_prediction.archive is not None and n_forecasts > 0:
+                    df_fc = LMW_prediction.archive.last(n_forecasts + 1)
+                    groups = list(df_fc.groupby('issue'))[:-1]
+                    for i, (issue, fc) in enumerate(groups):
+                        fig.add_trace(go.Scatter(x=fc['valid'], y=fc['value'], mode = 'lines', name = 'eerdere verwachtingen',
+                                                 legendgroup = 'eerdere verwachtingen', showlegend = (i == 0),
+                                                 hovertext = 'uitgegeven ' + pd.Timestamp(issue).strftime('%Y-%m-%d %H:%M'),
+                                                 line= dict(color='lightgrey', width = 1)))
+
                 Q_pred = fill_series.copy()
                 Q_pred.update(LMW_prediction.get_data())
                 fig.add_trace(go.Scatter(x=x, y=Q_pred, mode = 'lines', name = 'verwacht', line= dict(color='grey', dash = 'dash')))
@@ -99,22 +127,23 @@ def build_page(LMW_series, LMW_prediction,prefix):
     """
     Build the page with the given LMW_series and prefix.
     """
-    return([dbc.Row(html.H2('Afvoer ' + LMW_series.attributes['name'] + ' ' + str(LMW_series.current_year()), id=prefix + 'title')),
+    snapshot = LMW_series.get_snapshot()
+    return([dbc.Row(html.H2('Afvoer ' + LMW_series.attributes['name'] + ' ' + str(LMW_series.current_year(snapshot=snapshot)), id=prefix + 'title')),
             dbc.Row(html.H5(create_subtitle([1991, 2020]), id=prefix + 'subtitle')),
             dbc.Row([
-                dbc.Col(dcc.RangeSlider(id=prefix + 'qRange', min=0, max=LMW_series.range_max(),
-                                        value=[0, LMW_series.range_max(LMW_series.current_year())],
+                dbc.Col(dcc.RangeSlider(id=prefix + 'qRange', min=0, max=LMW_series.range_max(snapshot=snapshot),
+                                        value=[0, LMW_series.range_max(LMW_series.current_year(snapshot=snapshot), snapshot=snapshot)],
                                         #step=range_step, 
                                         vertical=True), width=1),
-                dbc.Col(dcc.Graph(id=prefix + 'graph', figure=build_graph(LMW_series, LMW_prediction)), width=9),
+                dbc.Col(dcc.Graph(id=prefix + 'graph', figure=build_graph(LMW_series, LMW_prediction, snapshot=snapshot)), width=9),
                 dbc.Col([
                     dbc.Row(html.H6("Referentiejaar")),
                     dbc.Row([
-                        dcc.Dropdown(id=prefix + 'ref_yr', options=LMW_series.get_data().index.year.unique(),
-                                     value=LMW_series.current_year()),
+                        dcc.Dropdown(id=prefix + 'ref_yr', options=LMW_series.years(snapshot=snapshot),
+                                     value=LMW_series.current_year(snapshot=snapshot)),
                         html.H6("Extra jaren"),
                         dcc.Dropdown(id=prefix + 'extra_yrs',
-                                     options=LMW_series.get_data().index.year.unique(), value=[], multi=True)
+                                     options=LMW_series.years(snapshot=snapshot), value=[], multi=True)
                     ])
                 ])
             ]),
@@ -122,12 +151,12 @@ def build_page(LMW_series, LMW_prediction,prefix):
              dbc.Col([
                       dbc.Label('Statistiek berekenen over'),
                       dcc.RangeSlider(id=prefix + 'stats',
-                                      min= min(LMW_series.time_range('years')),
-                                      max = max(LMW_series.time_range('years')),
+                                      min= min(LMW_series.time_range('years', snapshot=snapshot)),
+                                      max = max(LMW_series.time_range('years', snapshot=snapshot)),
                                       #step = None,
-                                      value = list(LMW_series.time_range('climate')),
+                                      value = list(LMW_series.time_range('climate', snapshot=snapshot)),
                                       pushable = 20,
-                                      marks = LMW_series.time_range('marks')
+                                      marks = LMW_series.time_range('marks', snapshot=snapshot)
                                       #marks={}
                                     )
                       ],
@@ -151,13 +180,19 @@ Rijn_verw = LMWTimeseries('lobith_verwacht.cfg')
 Maas = LMWTimeseries('stpieter.cfg')
 Maas_verw = LMWTimeseries('stpieter_verwacht.cfg')
 
+# alle reeksen, ook de verwachtingen, worden door de update taak (lobith_update_task.py) bijgewerkt
 #Rijn.update()
-Rijn_verw.update(append=False)
+#Rijn_verw.update(append=False)
 #Maas.update()
-Maas_verw.update(append=False)
+#Maas_verw.update(append=False)
+
+register_routes(app.server, {'lobith': Rijn, 'lobith_verwacht': Rijn_verw,
+                             'stpieter': Maas, 'stpieter_verwacht': Maas_verw})
+
+# nieuwe regels die de update taak aan de databestanden toevoegt worden in de draaiende app ingelezen
+for LMW_series in [Rijn, Rijn_verw, Maas, Maas_verw]:
+    LMW_series.watch()
 
-p1 = build_page(Rijn, Rijn_verw,'r_')
-p2 = build_page(Maas, Maas_verw, 'm_')
 #p3 = [item for p in [p1,p2] for item in p]
 
 card = dbc.Card(
@@ -170,7 +205,7 @@ card = dbc.Card(
                         id="tabs", 
                         active_tab="r_tab"
                 )),
-        dbc.CardBody(html.Div(p1, id='card-content')),
+        dbc.CardBody(html.Div(id='card-content')),
     ],
     style={"width": "100%", "margin-top": "40px"},
 )
@@ -185,12 +220,11 @@ app.layout = dbc.Container(card)
     ]
 )
 def render_content(tab):
-    if tab == 'r_tab':
-        return p1
-    elif tab == 'm_tab':
-        return p2
+    # de pagina wordt steeds opnieuw opgebouwd, zodat jaren en bereiken de actuele data volgen
+    if tab == 'm_tab':
+        return build_page(Maas, Maas_verw, 'm_')
     else:
-        return p1
+        return build_page(Rijn, Rijn_verw,'r_')
 
 @app.callback(
     Output(component_id='r_graph', component_property='figure'),[
@@ -1,11 +1,12 @@
 from LMWTimeseries import LMWTimeseries
 
 Rijn = LMWTimeseries('lobith.cfg')
-#Rijn_verw = LMWTimeseries('lobith_verwacht.cfg')
+Rijn_verw = LMWTimeseries('lobith_verwacht.cfg')
 Maas = LMWTimeseries('stpieter.cfg')
-#Maas_verw = LMWTimeseries('stpieter_verwacht.cfg')
+Maas_verw = LMWTimeseries('stpieter_verwacht.cfg')
 
 Rijn.update()
 Maas.update()
-#Rijn_verw.update()
-#Maas_verw.update()
\ No newline at end of file
+# verwachtingen worden vervangen; elke nieuwe uitgifte wordt aan het archief toegevoegd
+Rijn_verw.update(append=False)
+Maas_verw.update(append=False)
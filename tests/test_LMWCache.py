@@ -0,0 +1,115 @@
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+from LMWCache import LMWCache
+from LMWStubServer import LMWStubHandler, make_server
+from LMWTimeseries import LMWTimeseries
+
+today = pd.Timestamp.today().normalize()
+day = pd.Timedelta(1, 'd')
+
+class RecordingHandler(LMWStubHandler):
+    """
+    Stub handler that records the requested periods as (first day, last day).
+    """
+    periods = []
+
+    def replay(self, request):
+        self.periods.append((pd.Timestamp(request['Periode']['Begindatumtijd'][:10]),
+                             pd.Timestamp(request['Periode']['Einddatumtijd'][:10]) - day))
+        return super().replay(request)
+
+    def log_message(self, format, *args):
+        pass
+
+def record_response(cache, days, fetched):
+    """
+    Store a response with 10-minute observations for the given days in the cache.
+    """
+    timestamps = pd.date_range(days[0], min(days[-1] + day, pd.Timestamp.now()), freq='10min', inclusive='left')
+    metingen = [{'Tijdstip': ts.strftime('%Y-%m-%dT%H:%M:%S.000+01:00'),
+                 'Meetwaarde': {'Waarde_Numeriek': 2000.0 + i % 50},
+                 'WaarnemingMetadata': {'StatuswaardeLijst': ['Ongecontroleerd']}}
+                for i, ts in enumerate(timestamps)]
+    result = {'Succesvol': True,
+              'WaarnemingenLijst': [{'Locatie': {'Code': 'LOBI'},
+                                     'AquoMetadata': {'Grootheid': {'Code': 'Q'}},
+                                     'MetingenLijst': metingen}]}
+    cache.store('LOBI', 'Q', days, result, now=fetched)
+
+@pytest.fixture
+def stub(tmp_path):
+    """
+    Stub server replaying a recorded cache, returns the url and the list of requested periods.
+    """
+    record_response(LMWCache(tmp_path / 'recorded'), pd.date_range(today - 10 * day, today + 7 * day), pd.Timestamp.now())
+
+    class Handler(RecordingHandler):
+        periods = []
+
+    server = make_server(tmp_path / 'recorded', 0, Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://localhost:{server.server_address[1]}/OphalenWaarnemingen', Handler.periods
+    server.shutdown()
+
+def write_config(tmp_path, url):
+    data_file = tmp_path / 'Q.csv'
+    days = pd.date_range(today - 10 * day, today - 6 * day)
+    pd.Series(np.full(len(days), 2000.0), index=days, name='Q').to_csv(data_file, index_label='timestamp')
+
+    cfg = tmp_path / 'test.cfg'
+    cfg.write_text(f'name = Test\n'
+                   f'current_data_file = {data_file}\n'
+                   f'LMW_loc_code = LOBI\nLMW_loc_X = 1\nLMW_loc_Y = 2\nLMW_grootheid_code = Q\n'
+                   f'LMW_url = {url}\n'
+                   f'cache_dir = {tmp_path / "cache"}\ncache_ttl = 60\n'
+                   f'update_log_file = {tmp_path / "update.log"}\n')
+    return cfg
+
+def test_missing_ranges(tmp_path):
+    cache = LMWCache(tmp_path)
+    days = pd.date_range(today - 5 * day, today + 2 * day)
+    # volledige dagen in het verleden en een verlopen dag van vandaag
+    record_response(cache, days[1:3], today)
+    record_response(cache, days[5:6], pd.Timestamp.now() - pd.Timedelta(2, 'h'))
+
+    assert cache.missing_ranges('LOBI', 'Q', days) == [(days[0], days[0]), (days[3], days[-1])]
+
+def test_update_requests_only_missing_days(tmp_path, stub):
+    url, periods = stub
+    cfg = write_config(tmp_path, url)
+
+    # een deel van de ontbrekende dagen staat al in de cache
+    record_response(LMWCache(tmp_path / 'cache'), pd.date_range(today - 5 * day, today - 3 * day), today)
+
+    meta, _ = LMWTimeseries(cfg).update()
+    assert meta['has_data']
+    assert periods == [(today - 2 * day, today + 6 * day)]
+
+    data = LMWTimeseries(cfg).get_data()
+    assert data.index[0] == today - 10 * day
+    assert data.index[-1] == today - day
+    assert not data.index.duplicated().any()
+
+def test_restart_within_ttl_makes_no_request(tmp_path, stub):
+    url, periods = stub
+    cfg = write_config(tmp_path, url)
+
+    LMWTimeseries(cfg).update(append=False)
+    assert len(periods) == 1
+
+    meta, _ = LMWTimeseries(cfg).update(append=False)
+    assert meta['has_data']
+    assert len(periods) == 1
+
+def test_failed_request_is_not_reported_as_success(tmp_path):
+    cfg = write_config(tmp_path, 'http://localhost:1/OphalenWaarnemingen')
+    # verlopen, onvolledige dag in de cache
+    record_response(LMWCache(tmp_path / 'cache'), pd.date_range(today, today), pd.Timestamp.now() - pd.Timedelta(2, 'h'))
+
+    s = LMWTimeseries(cfg)
+    s.request_data = lambda start_day, end_day: (503, None)
+    status_code, result, ranges = s.fetch(today, today + day)
+    assert status_code == 503
+    assert result is None
@@ -0,0 +1,37 @@
+import pytest
+from flask import Flask
+import LMWExport
+from LMWTimeseries import LMWTimeseries
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(LMWExport, 'chunk_size', 3)
+    server = Flask(__name__)
+    LMWExport.register_routes(server, {'lobith': LMWTimeseries('lobith.cfg')})
+    return server.test_client()
+
+def test_jsonl_has_one_line_per_row(client):
+    body = client.get('/api/lobith/series?start=2025-11-18&end=2025-11-23&format=jsonl').data.decode()
+    assert body.endswith('\n')
+    assert len(body.split('\n')) == 7
+    assert '' not in body.split('\n')[:-1]
+
+def test_etag(client):
+    r = client.get('/api/lobith/series?start=2025-11-18')
+    assert r.status_code == 200
+    r = client.get('/api/lobith/series?start=2025-11-18', headers={'If-None-Match': r.headers['ETag']})
+    assert r.status_code == 304
+
+@pytest.mark.parametrize('query', ['start_yr=abc', 'window=0', 'window=400', 'quantiles=x', 'quantiles=2',
+                                   'quantiles=0.5,0.5', 'quantiles=0.001,0.005'])
+def test_stats_invalid_parameters(client, query):
+    assert client.get('/api/lobith/stats?' + query).status_code == 400
+
+def test_series_timezone_aware_start(client):
+    r = client.get('/api/lobith/series?start=2025-11-20T00:00:00%2B01:00')
+    assert r.status_code == 200
+    assert r.data.decode().split('\n')[1].startswith('2025-11-20')
+
+@pytest.mark.parametrize('query', ['start=', 'end=foo'])
+def test_series_invalid_dates(client, query):
+    assert client.get('/api/lobith/series?' + query).status_code == 400
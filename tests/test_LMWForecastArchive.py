@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+from LMWForecastArchive import LMWForecastArchive
+
+def forecast(issue_day, values):
+    return pd.Series(values, index=pd.date_range(issue_day, periods=len(values)), dtype=float)
+
+@pytest.fixture
+def archive(tmp_path):
+    # 10 dagelijkse uitgiftes om 08:00 met 3 dagen vooruit; waarde = 100 * dag + lead
+    archive = LMWForecastArchive(tmp_path / 'archive')
+    for i in range(10):
+        issue_day = pd.Timestamp('2025-01-01') + pd.Timedelta(i, 'D')
+        assert archive.append(issue_day + pd.Timedelta(8, 'h'), forecast(issue_day, [100 * i + lead for lead in range(3)]))
+    return archive
+
+def test_identical_repeat_is_not_stored(archive):
+    last = archive.last(1)
+    repeat = pd.Series(last['value'].to_numpy(), index=last['valid'])
+    assert not archive.append(pd.Timestamp('2025-01-10 09:00'), repeat)
+    assert len(archive.read_index()) == 10
+
+def test_out_of_order_issue_time(archive):
+    with pytest.raises(ValueError):
+        archive.append(pd.Timestamp('2025-01-05'), forecast('2025-01-05', [1.0, 2.0]))
+
+def test_last(archive):
+    df = archive.last(2)
+    assert list(df['issue'].unique()) == list(pd.to_datetime(['2025-01-09 08:00', '2025-01-10 08:00']))
+    assert list(df['value']) == [800, 801, 802, 900, 901, 902]
+
+def test_valid_for(archive):
+    df = archive.valid_for('2025-01-05')
+    assert list(df['lead']) == [2, 1, 0]
+    assert list(df['value']) == [202, 301, 400]
+    assert len(archive.valid_for('2024-12-31')) == 0
+
+def test_by_lead_and_skill(archive):
+    fc = archive.by_lead(1, start='2025-01-03', end='2025-01-05 12:00')
+    assert list(fc.index) == list(pd.to_datetime(['2025-01-04', '2025-01-05', '2025-01-06']))
+    assert list(fc) == [201, 301, 401]
+
+    observed = pd.Series((np.arange(20) - 1) * 100.0, index=pd.date_range('2025-01-01', periods=20))
+    skill = archive.skill(observed, 1, start='2025-01-03', end='2025-01-05 12:00')
+    assert skill['n'] == 3
+    assert skill['bias'] == pytest.approx(1.0)
+    assert skill['mae'] == pytest.approx(1.0)
+    assert skill['rmse'] == pytest.approx(1.0)
+
+def test_interrupted_append_is_overwritten(archive):
+    # records zonder indexregel, zoals na een onderbroken schrijfactie
+    with open(archive.records_file, 'ab') as f:
+        np.zeros(5, dtype=archive.record_dtype).tofile(f)
+    assert len(archive.last(1)) == 3
+
+    assert archive.append(pd.Timestamp('2025-01-11 08:00'), forecast('2025-01-11', [7.0, 8.0]))
+    size = archive.records_file.stat().st_size
+    assert size == 32 * archive.record_dtype.itemsize
+    assert list(archive.last(1)['value']) == [7, 8]
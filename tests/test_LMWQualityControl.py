@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+from LMWQualityControl import LMWQualityControl
+
+# bits in de volgorde waarin de standaard controles worden toegevoegd
+MISSING, RANGE, RATE, FLATLINE, GAP = 1, 2, 4, 8, 16
+
+def observations(values, start = '2025-01-01 00:00', drop = ()):
+    index = pd.date_range(start, periods=len(values), freq='10min')
+    s = pd.Series(values, index=index, dtype=float)
+    return s.drop(index[list(drop)])
+
+@pytest.fixture
+def qc():
+    return LMWQualityControl(interval=10, min_value=0, max_value=20000, max_rate=20, flatline=4, max_gap=30)
+
+def test_flags(qc):
+    # 0: ok, 1: ontbrekend, 2: boven bereik (geen piek, want de vorige waarde ontbreekt), 3-4: ok, 5: piek, 6: ok, 7-10: vlakke lijn, 11: na een gat
+    values = [1000, np.nan, 30000, 1000, 1010, 1500, 1020, 1030, 1030, 1030, 1030, 1040, 1050, 1060]
+    s = observations(values, drop=[12, 13])
+    s = pd.concat([s, observations([1045], start='2025-01-01 03:00')])
+    flags = qc.run(s)
+
+    expected = np.zeros(len(s), dtype=np.uint8)
+    expected[1] = MISSING
+    expected[2] = RANGE
+    expected[5] = RATE
+    expected[7:11] = FLATLINE
+    expected[12] = GAP
+    np.testing.assert_array_equal(flags, expected)
+
+    assert qc.summary(flags) == {'missing': 1, 'range': 1, 'rate': 1, 'flatline': 4, 'gap': 1}
+    # een gat wordt alleen gemeld, niet afgekeurd
+    np.testing.assert_array_equal(np.nonzero(qc.rejected(flags))[0], [1, 2, 5, 7, 8, 9, 10])
+
+def test_step_is_not_a_spike(qc):
+    flags = qc.run(observations([1000, 1000.5, 1500, 1500.5, 1501]))
+    assert not (flags & RATE).any()
+
+def test_empty_batch(qc):
+    s = pd.Series([], index=pd.DatetimeIndex([]), dtype=float)
+    flags = qc.run(s)
+    assert len(flags) == 0
+    assert len(qc.completeness(s, flags)) == 0
+
+def test_completeness(qc):
+    # dag 1 volledig (144 waarden, 3 afgekeurd), dag 2 met 72 waarden
+    values = np.arange(216, dtype=float) + 1000
+    values[[10, 20, 30]] = np.nan
+    s = observations(values)
+    c = qc.completeness(s, qc.run(s))
+    assert list(c.index) == list(pd.to_datetime(['2025-01-01', '2025-01-02']))
+    assert c.iloc[0] == pytest.approx(141 / 144)
+    assert c.iloc[1] == pytest.approx(0.5)
+
+def test_write_and_read_flags(qc, tmp_path):
+    file = tmp_path / 'flags.bin'
+    s = observations([1000, np.nan, 1020, 1030])
+    qc.write_flags(file, s[:3], np.array([0, MISSING, 0], dtype=np.uint8))
+    # een tweede controle van dezelfde waarnemingen vervangt de eerdere vlaggen
+    qc.write_flags(file, s[2:], np.array([GAP, 0], dtype=np.uint8))
+
+    flags = qc.read_flags(file)
+    assert list(flags.index) == list(s.index)
+    assert list(flags) == [0, MISSING, GAP, 0]
+    assert len(qc.read_flags(tmp_path / 'missing.bin')) == 0
+
+def test_add_check_limit():
+    qc = LMWQualityControl()
+    for i in range(6):
+        qc.add_check(f'extra_{i}', lambda v, t: v < 0)
+    assert qc.checks[-1]['bit'] == 128
+    with pytest.raises(ValueError):
+        qc.add_check('one_too_many', lambda v, t: v < 0)
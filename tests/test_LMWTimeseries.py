@@ -0,0 +1,62 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from LMWTimeseries import LMWTimeseries
+
+@pytest.fixture
+def cfg(tmp_path):
+    data_file = tmp_path / 'Q.csv'
+    days = pd.date_range('2000-01-01', '2025-12-20')
+    pd.Series(np.arange(len(days), dtype=float) % 3000, index=days, name='Q').to_csv(
+        data_file, index_label='timestamp', float_format='%.2f')
+    cfg = tmp_path / 'test.cfg'
+    cfg.write_text(f'name = Test\ncurrent_data_file = {data_file}\nLMW_grootheid_code = Q\n')
+    return cfg, data_file
+
+def append_rows(data_file, rows):
+    """
+    Rewrite the data file with extra rows, as update() does.
+    """
+    df = pd.read_csv(data_file)
+    df = pd.concat([df, pd.DataFrame(rows, columns=['timestamp', 'Q'])])
+    df.to_csv(str(data_file) + '.tmp', index=False, float_format='%.2f')
+    os.replace(str(data_file) + '.tmp', data_file)
+
+def test_refresh_after_gap_matches_full_reload(cfg):
+    cfg, data_file = cfg
+    s = LMWTimeseries(cfg)
+    s.calculate_stats(2001, 2020, [0.1, 0.5, 0.9])
+    s.calculate_stats(2001, 2025, [0.1, 0.5, 0.9])
+
+    append_rows(data_file, [('2025-12-21', 100.0), ('2026-01-01', 5000.0)])
+    assert s.refresh()
+
+    full = LMWTimeseries(cfg)
+    pd.testing.assert_series_equal(s.get_data(), full.get_data())
+    assert s.current_year() == 2026
+    assert s.range_max(2026) == 6000
+    assert list(s.get_snapshot()[1]['stats']) == [(2001, 2020, (0.1, 0.5, 0.9), 5)]
+    assert not s.refresh()
+
+def test_stats_cache_is_bounded(cfg):
+    cfg, _ = cfg
+    s = LMWTimeseries(cfg)
+    s.stats_cache_size = 3
+    for end_yr in range(2010, 2016):
+        s.calculate_stats(2001, end_yr, [0.5])
+    assert [k[1] for k in s.get_snapshot()[1]['stats']] == [2013, 2014, 2015]
+
+def test_watch_logs_refresh_errors(cfg, tmp_path):
+    cfg, _ = cfg
+    log_file = tmp_path / 'update.log'
+    cfg.write_text(cfg.read_text() + f'update_log_file = {log_file}\n')
+    s = LMWTimeseries(cfg)
+
+    def failing_refresh():
+        raise RuntimeError('boom')
+    s.refresh = failing_refresh
+    s.watch(interval=0.01)
+    time.sleep(0.2)
+    assert 'RuntimeError' in log_file.read_text()
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+from LMWTimeseries import LMWTimeseries
+
+@pytest.fixture
+def series(tmp_path):
+    # dag 3 ontbreekt en beeindigt het eerste event; het laatste event loopt tot de laatste dag
+    values = [1200, 900, 800, np.nan, 700, 1100, 6500, 7000, 1000, 950]
+    days = pd.date_range('2020-01-01', periods=len(values))
+    data_file = tmp_path / 'Q.csv'
+    pd.Series(values, index=days, name='Q').to_csv(data_file, index_label='timestamp')
+    cfg = tmp_path / 'test.cfg'
+    cfg.write_text(f'name = Test\ncurrent_data_file = {data_file}\nLMW_grootheid_code = Q\n')
+    return LMWTimeseries(cfg)
+
+def test_low_flow_events(series):
+    events = series.detect_events(1000)
+    assert list(events['start']) == list(pd.to_datetime(['2020-01-02', '2020-01-05', '2020-01-10']))
+    assert list(events['end']) == list(pd.to_datetime(['2020-01-03', '2020-01-05', '2020-01-10']))
+    assert list(events['duration']) == [2, 1, 1]
+    assert list(events['volume']) == [300 * 86400, 300 * 86400, 50 * 86400]
+    assert list(events['peak']) == [800, 700, 950]
+    assert (events['threshold'] == 1000).all()
+
+def test_multiple_thresholds_and_min_duration(series):
+    events = series.detect_events([850, 1000], min_duration=2)
+    assert list(events['threshold']) == [1000]
+    assert events['start'].iloc[0] == pd.Timestamp('2020-01-02')
+
+    events = series.detect_events([850, 1000])
+    assert list(events.groupby('threshold').size()) == [2, 3]
+
+def test_high_flow_events(series):
+    events = series.detect_events(6000, kind='high')
+    assert len(events) == 1
+    assert events['start'].iloc[0] == pd.Timestamp('2020-01-07')
+    assert events['duration'].iloc[0] == 2
+    assert events['volume'].iloc[0] == 1500 * 86400
+    assert events['peak'].iloc[0] == 7000
+
+def test_no_events_and_invalid_kind(series):
+    assert len(series.detect_events(100)) == 0
+    with pytest.raises(ValueError):
+        series.detect_events(1000, kind='medium')